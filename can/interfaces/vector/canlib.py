@@ -1287,6 +1287,7 @@ def _hw_type(hw_type: int) -> Union[int, xldefine.XL_HardwareType]:
 
 def _iterate_channel_index(channel_mask: int) -> Iterator[int]:
     """Iterate over channel indexes in channel mask."""
-    for channel_index, bit in enumerate(reversed(bin(channel_mask)[2:])):
-        if bit == "1":
-            yield channel_index
+    while channel_mask:
+        lowest_bit = channel_mask & -channel_mask
+        yield lowest_bit.bit_length() - 1
+        channel_mask ^= lowest_bit
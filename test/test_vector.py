@@ -10,7 +10,8 @@ import pickle
 import sys
 import time
 from test.config import IS_WINDOWS
-from unittest.mock import Mock
+from typing import Any, Dict, Iterator
+from unittest.mock import ANY, Mock, patch
 
 import pytest
 
@@ -30,37 +31,65 @@ from can.interfaces.vector import (
 
 XLDRIVER_FOUND = canlib.xldriver is not None
 
+_XL_INTERFACE_VERSION = xldefine.XL_InterfaceVersion.XL_INTERFACE_VERSION.value
+_XL_INTERFACE_VERSION_V4 = xldefine.XL_InterfaceVersion.XL_INTERFACE_VERSION_V4.value
+_XL_BUS_TYPE_CAN = xldefine.XL_BusTypes.XL_BUS_TYPE_CAN.value
+_XL_OUTPUT_MODE_SILENT = xldefine.XL_OutputMode.XL_OUTPUT_MODE_SILENT.value
+_XL_CANOPMODE_CANFD = (
+    xldefine.XL_CANFD_BusParams_CanOpMode.XL_BUS_PARAMS_CANOPMODE_CANFD.value
+)
+
+# bit timings are read-only, so they can be shared by all tests
+_TIMING_8MHZ = can.BitTiming.from_bitrate_and_segments(
+    f_clock=8_000_000, bitrate=125_000, tseg1=13, tseg2=2, sjw=1
+)
+_TIMING_16MHZ = can.BitTiming.from_bitrate_and_segments(
+    f_clock=16_000_000, bitrate=125_000, tseg1=13, tseg2=2, sjw=1
+)
+_TIMING_FD_80MHZ = can.BitTimingFd.from_bitrate_and_segments(
+    f_clock=80_000_000,
+    nom_bitrate=500_000,
+    nom_tseg1=68,
+    nom_tseg2=11,
+    nom_sjw=10,
+    data_bitrate=2_000_000,
+    data_tseg1=10,
+    data_tseg2=9,
+    data_sjw=8,
+)
+
 
-@pytest.fixture()
-def mock_xldriver() -> None:
-    # basic mock for XLDriver
-    xldriver_mock = Mock()
-
-    # bus creation functions
-    xldriver_mock.xlOpenDriver = Mock()
-    xldriver_mock.xlGetApplConfig = Mock(side_effect=xlGetApplConfig)
-    xldriver_mock.xlGetChannelIndex = Mock(side_effect=xlGetChannelIndex)
-    xldriver_mock.xlOpenPort = Mock(side_effect=xlOpenPort)
-    xldriver_mock.xlCanFdSetConfiguration = Mock(return_value=0)
-    xldriver_mock.xlCanSetChannelMode = Mock(return_value=0)
-    xldriver_mock.xlActivateChannel = Mock(return_value=0)
-    xldriver_mock.xlGetSyncTime = Mock(side_effect=xlGetSyncTime)
-    xldriver_mock.xlCanSetChannelAcceptance = Mock(return_value=0)
-    xldriver_mock.xlCanSetChannelBitrate = Mock(return_value=0)
-    xldriver_mock.xlSetNotification = Mock(side_effect=xlSetNotification)
-    xldriver_mock.xlCanSetChannelOutput = Mock(return_value=0)
-
-    # bus deactivation functions
-    xldriver_mock.xlDeactivateChannel = Mock(return_value=0)
-    xldriver_mock.xlClosePort = Mock(return_value=0)
-    xldriver_mock.xlCloseDriver = Mock()
-
-    # sender functions
-    xldriver_mock.xlCanTransmit = Mock(return_value=0)
-    xldriver_mock.xlCanTransmitEx = Mock(return_value=0)
-
-    # various functions
-    xldriver_mock.xlCanFlushTransmitQueue = Mock()
+def _xldriver_mock_config() -> Dict[str, Any]:
+    """Attribute configuration of the XLDriver mock for :func:`Mock.configure_mock`."""
+    return {
+        # bus creation functions
+        "xlGetApplConfig.side_effect": xlGetApplConfig,
+        "xlOpenPort.side_effect": xlOpenPort,
+        "xlCanFdSetConfiguration.return_value": 0,
+        "xlCanSetChannelMode.return_value": 0,
+        "xlActivateChannel.return_value": 0,
+        "xlCanSetChannelAcceptance.return_value": 0,
+        "xlCanSetChannelBitrate.return_value": 0,
+        "xlCanSetChannelOutput.return_value": 0,
+        # never asserted, so the plain functions are used instead of a Mock
+        "xlGetChannelIndex": xlGetChannelIndex,
+        "xlGetSyncTime": xlGetSyncTime,
+        "xlSetNotification": xlSetNotification,
+        # bus deactivation functions
+        "xlDeactivateChannel.return_value": 0,
+        "xlClosePort.return_value": 0,
+        # sender functions
+        "xlCanTransmit.return_value": 0,
+        "xlCanTransmitEx.return_value": 0,
+    }
+
+
+@pytest.fixture(scope="class")
+def mock_xldriver() -> Iterator[Mock]:
+    # basic mock for XLDriver, it is shared by all tests of the class.
+    # It is only reset by the autouse fixture of TestVectorMocked,
+    # so tests outside of that class must not request it.
+    xldriver_mock = Mock(**_xldriver_mock_config())
 
     # backup unmodified values
     real_xldriver = canlib.xldriver
@@ -69,9 +98,10 @@ def mock_xldriver() -> None:
 
     # set mock
     canlib.xldriver = xldriver_mock
+    canlib.WaitForSingleObject = lambda handle, milliseconds: 0
     canlib.HAS_EVENTS = False
 
-    yield
+    yield xldriver_mock
 
     # cleanup
     canlib.xldriver = real_xldriver
@@ -79,367 +109,451 @@ def mock_xldriver() -> None:
     canlib.HAS_EVENTS = real_has_events
 
 
-def test_listen_only_mocked(mock_xldriver) -> None:
-    bus = can.Bus(channel=0, interface="vector", listen_only=True, _testing=True)
-    assert isinstance(bus, canlib.VectorBus)
-    assert bus.protocol == can.CanProtocol.CAN_20
+class TestVectorMocked:
+    """Tests which replace the Vector XL API with a Mock."""
 
-    can.interfaces.vector.canlib.xldriver.xlCanSetChannelOutput.assert_called()
-    xlCanSetChannelOutput_args = (
-        can.interfaces.vector.canlib.xldriver.xlCanSetChannelOutput.call_args[0]
-    )
-    assert xlCanSetChannelOutput_args[2] == xldefine.XL_OutputMode.XL_OUTPUT_MODE_SILENT
+    @pytest.fixture(autouse=True)
+    def _reset_mock_xldriver(self, mock_xldriver) -> None:
+        # restore the side effects and return values
+        # that earlier tests may have replaced
+        mock_xldriver.reset_mock(return_value=True, side_effect=True)
+        mock_xldriver.configure_mock(**_xldriver_mock_config())
 
+    def test_listen_only_mocked(self, mock_xldriver) -> None:
+        bus = can.Bus(channel=0, interface="vector", listen_only=True, _testing=True)
+        assert type(bus) is canlib.VectorBus
+        assert bus.protocol == can.CanProtocol.CAN_20
 
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_listen_only() -> None:
-    bus = can.Bus(
-        channel=0,
-        serial=_find_virtual_can_serial(),
-        interface="vector",
-        receive_own_messages=True,
-        listen_only=True,
-    )
-    assert isinstance(bus, canlib.VectorBus)
-    assert bus.protocol == can.CanProtocol.CAN_20
+        mock_xldriver.xlCanSetChannelOutput.assert_called_once_with(
+            ANY, ANY, _XL_OUTPUT_MODE_SILENT
+        )
 
-    msg = can.Message(
-        arbitration_id=0xC0FFEF, data=[1, 2, 3, 4, 5, 6, 7, 8], is_extended_id=True
+    @pytest.mark.parametrize(
+        "bus_kwargs,protocol,interface_version",
+        [
+            (
+                {},
+                can.CanProtocol.CAN_20,
+                _XL_INTERFACE_VERSION,
+            ),
+            (
+                {"bitrate": 200_000},
+                can.CanProtocol.CAN_20,
+                _XL_INTERFACE_VERSION,
+            ),
+            (
+                {"fd": True},
+                can.CanProtocol.CAN_FD,
+                _XL_INTERFACE_VERSION_V4,
+            ),
+        ],
+        ids=["default", "bitrate", "fd"],
     )
+    def test_bus_creation_mocked(
+        self, mock_xldriver, bus_kwargs, protocol, interface_version
+    ) -> None:
+        bus = can.Bus(channel=0, interface="vector", _testing=True, **bus_kwargs)
+        assert type(bus) is canlib.VectorBus
+        assert bus.protocol == protocol
+
+        mock_xldriver.xlOpenDriver.assert_called()
+        mock_xldriver.xlGetApplConfig.assert_called()
+
+        _assert_open_port(mock_xldriver, interface_version)
+
+        if protocol is can.CanProtocol.CAN_FD:
+            mock_xldriver.xlCanFdSetConfiguration.assert_called()
+        else:
+            mock_xldriver.xlCanFdSetConfiguration.assert_not_called()
+
+        if "bitrate" in bus_kwargs:
+            mock_xldriver.xlCanSetChannelBitrate.assert_called_once_with(
+                ANY, ANY, bus_kwargs["bitrate"]
+            )
+        else:
+            mock_xldriver.xlCanSetChannelBitrate.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "bus_kwargs,can_fd_conf",
+        [
+            (
+                {
+                    "fd": True,
+                    "bitrate": 500_000,
+                    "data_bitrate": 2_000_000,
+                    "sjw_abr": 16,
+                    "tseg1_abr": 127,
+                    "tseg2_abr": 32,
+                    "sjw_dbr": 6,
+                    "tseg1_dbr": 27,
+                    "tseg2_dbr": 12,
+                },
+                {
+                    "arbitrationBitRate": 500_000,
+                    "dataBitRate": 2_000_000,
+                    "sjwAbr": 16,
+                    "tseg1Abr": 127,
+                    "tseg2Abr": 32,
+                    "sjwDbr": 6,
+                    "tseg1Dbr": 27,
+                    "tseg2Dbr": 12,
+                },
+            ),
+            (
+                {"timing": _TIMING_FD_80MHZ},
+                {
+                    "arbitrationBitRate": 500_000,
+                    "dataBitRate": 2_000_000,
+                    "sjwAbr": 10,
+                    "tseg1Abr": 68,
+                    "tseg2Abr": 11,
+                    "sjwDbr": 8,
+                    "tseg1Dbr": 10,
+                    "tseg2Dbr": 9,
+                },
+            ),
+        ],
+        ids=["bitrate_timings", "timingfd"],
+    )
+    def test_bus_creation_fd_timing_mocked(
+        self, mock_xldriver, bus_kwargs, can_fd_conf
+    ) -> None:
+        bus = can.Bus(channel=0, interface="vector", _testing=True, **bus_kwargs)
+        assert type(bus) is canlib.VectorBus
+        assert bus.protocol == can.CanProtocol.CAN_FD
 
-    bus.send(msg)
-
-    received_msg = bus.recv()
-
-    assert received_msg.arbitration_id == msg.arbitration_id
-    assert received_msg.data == msg.data
-
-    bus.shutdown()
-
-
-def test_bus_creation_mocked(mock_xldriver) -> None:
-    bus = can.Bus(channel=0, interface="vector", _testing=True)
-    assert isinstance(bus, canlib.VectorBus)
-    assert bus.protocol == can.CanProtocol.CAN_20
-
-    can.interfaces.vector.canlib.xldriver.xlOpenDriver.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlGetApplConfig.assert_called()
-
-    can.interfaces.vector.canlib.xldriver.xlOpenPort.assert_called()
-    xlOpenPort_args = can.interfaces.vector.canlib.xldriver.xlOpenPort.call_args[0]
-    assert xlOpenPort_args[5] == xldefine.XL_InterfaceVersion.XL_INTERFACE_VERSION.value
-    assert xlOpenPort_args[6] == xldefine.XL_BusTypes.XL_BUS_TYPE_CAN.value
-
-    can.interfaces.vector.canlib.xldriver.xlCanFdSetConfiguration.assert_not_called()
-    can.interfaces.vector.canlib.xldriver.xlCanSetChannelBitrate.assert_not_called()
+        mock_xldriver.xlOpenDriver.assert_called()
+        mock_xldriver.xlGetApplConfig.assert_called()
 
+        _assert_open_port(mock_xldriver, _XL_INTERFACE_VERSION_V4)
 
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_bus_creation() -> None:
-    bus = can.Bus(channel=0, serial=_find_virtual_can_serial(), interface="vector")
-    assert isinstance(bus, canlib.VectorBus)
-    assert bus.protocol == can.CanProtocol.CAN_20
+        mock_xldriver.xlCanFdSetConfiguration.assert_called()
+        mock_xldriver.xlCanSetChannelBitrate.assert_not_called()
 
-    bus.shutdown()
+        canFdConf = mock_xldriver.xlCanFdSetConfiguration.call_args[0][2]
+        assert {
+            field: getattr(canFdConf, field) for field in can_fd_conf
+        } == can_fd_conf
 
-    xl_channel_config = _find_xl_channel_config(
-        serial=_find_virtual_can_serial(), channel=0
-    )
-    assert bus.channel_masks[0] == xl_channel_config.channelMask
-    assert (
-        xl_channel_config.busParams.data.can.canOpMode
-        & xldefine.XL_CANFD_BusParams_CanOpMode.XL_BUS_PARAMS_CANOPMODE_CAN20
+    @pytest.mark.parametrize(
+        "timing", [_TIMING_8MHZ, _TIMING_16MHZ], ids=["8mhz", "16mhz"]
     )
+    def test_bus_creation_timing_mocked(self, mock_xldriver, timing) -> None:
+        bus = can.Bus(channel=0, interface="vector", timing=timing, _testing=True)
+        assert type(bus) is canlib.VectorBus
+        mock_xldriver.xlOpenDriver.assert_called()
+        mock_xldriver.xlGetApplConfig.assert_called()
+
+        _assert_open_port(mock_xldriver, _XL_INTERFACE_VERSION)
+
+        mock_xldriver.xlCanFdSetConfiguration.assert_not_called()
+        if timing.f_clock == 8_000_000:
+            # 8 MHz timings are passed as BTR register values
+            mock_xldriver.xlCanSetChannelParamsC200.assert_called_once_with(
+                ANY, ANY, timing.btr0, timing.btr1
+            )
+        else:
+            mock_xldriver.xlCanSetChannelParams.assert_called()
+            chip_params = (mock_xldriver.xlCanSetChannelParams.call_args[0])[2]
+            assert chip_params.bitRate == 125_000
+            assert chip_params.sjw == 1
+            assert chip_params.tseg1 == 13
+            assert chip_params.tseg2 == 2
+            assert chip_params.sam == 1
+
+    def test_send_mocked(self, mock_xldriver) -> None:
+        bus = can.Bus(channel=0, interface="vector", _testing=True)
+        msg = can.Message(
+            arbitration_id=0xC0FFEF, data=[1, 2, 3, 4, 5, 6, 7, 8], is_extended_id=True
+        )
+        bus.send(msg)
+        mock_xldriver.xlCanTransmit.assert_called()
+        mock_xldriver.xlCanTransmitEx.assert_not_called()
+
+    def test_send_fd_mocked(self, mock_xldriver) -> None:
+        bus = can.Bus(channel=0, interface="vector", fd=True, _testing=True)
+        msg = can.Message(
+            arbitration_id=0xC0FFEF, data=[1, 2, 3, 4, 5, 6, 7, 8], is_extended_id=True
+        )
+        bus.send(msg)
+        mock_xldriver.xlCanTransmit.assert_not_called()
+        mock_xldriver.xlCanTransmitEx.assert_called()
+
+    def test_receive_mocked(self, mock_xldriver) -> None:
+        mock_xldriver.xlReceive.side_effect = xlReceive
+        bus = can.Bus(channel=0, interface="vector", _testing=True)
+        bus.recv(timeout=0.0)
+        mock_xldriver.xlReceive.assert_called()
+        mock_xldriver.xlCanReceive.assert_not_called()
+
+    def test_receive_fd_mocked(self, mock_xldriver) -> None:
+        mock_xldriver.xlCanReceive.side_effect = xlCanReceive
+        bus = can.Bus(channel=0, interface="vector", fd=True, _testing=True)
+        bus.recv(timeout=0.0)
+        mock_xldriver.xlReceive.assert_not_called()
+        mock_xldriver.xlCanReceive.assert_called()
+
+    def test_receive_non_msg_event_mocked(self, mock_xldriver) -> None:
+        mock_xldriver.xlReceive.side_effect = xlReceive_chipstate
+        bus = can.Bus(channel=0, interface="vector", _testing=True)
+        bus.handle_can_event = Mock()
+        bus.recv(timeout=0.0)
+        mock_xldriver.xlReceive.assert_called()
+        mock_xldriver.xlCanReceive.assert_not_called()
+        bus.handle_can_event.assert_called()
+
+    def test_receive_fd_non_msg_event_mocked(self, mock_xldriver) -> None:
+        mock_xldriver.xlCanReceive.side_effect = xlCanReceive_chipstate
+        bus = can.Bus(channel=0, interface="vector", fd=True, _testing=True)
+        bus.handle_canfd_event = Mock()
+        bus.recv(timeout=0.0)
+        mock_xldriver.xlReceive.assert_not_called()
+        mock_xldriver.xlCanReceive.assert_called()
+        bus.handle_canfd_event.assert_called()
+
+    def test_flush_tx_buffer_mocked(self, mock_xldriver) -> None:
+        bus = can.Bus(channel=0, interface="vector", _testing=True)
+        bus.flush_tx_buffer()
+        transmit_args = mock_xldriver.xlCanTransmit.call_args[0]
+
+        num_msg = transmit_args[2]
+        assert num_msg.value == 1
+
+        event = transmit_args[3]
+        assert isinstance(event, xlclass.XLevent)
+        assert event.tag & xldefine.XL_EventTags.XL_TRANSMIT_MSG
+        assert event.tagData.msg.flags & (
+            xldefine.XL_MessageFlags.XL_CAN_MSG_FLAG_OVERRUN
+            | xldefine.XL_MessageFlags.XL_CAN_MSG_FLAG_WAKEUP
+        )
 
-    bus = canlib.VectorBus(channel=0, serial=_find_virtual_can_serial())
-    assert isinstance(bus, canlib.VectorBus)
-    assert bus.protocol == can.CanProtocol.CAN_20
-    bus.shutdown()
-
-
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_bus_creation_channel_index() -> None:
-    channel_index = 1
-    bus = can.Bus(
-        channel=0,
-        serial=_find_virtual_can_serial(),
-        channel_index=channel_index,
-        interface="vector",
-    )
-    assert isinstance(bus, canlib.VectorBus)
-    assert bus.protocol == can.CanProtocol.CAN_20
-    assert bus.channel_masks[0] == 1 << channel_index
+    def test_flush_tx_buffer_fd_mocked(self, mock_xldriver) -> None:
+        bus = can.Bus(channel=0, interface="vector", fd=True, _testing=True)
+        bus.flush_tx_buffer()
+        transmit_args = mock_xldriver.xlCanTransmitEx.call_args[0]
 
-    bus.shutdown()
+        num_msg = transmit_args[2]
+        assert num_msg.value == 1
 
+        num_msg_sent = transmit_args[3]
+        assert num_msg_sent.value == 0
 
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_bus_creation_multiple_channels() -> None:
-    bus = can.Bus(
-        channel="0, 1",
-        bitrate=1_000_000,
-        serial=_find_virtual_can_serial(),
-        interface="vector",
-    )
-    assert isinstance(bus, canlib.VectorBus)
-    assert bus.protocol == can.CanProtocol.CAN_20
-    assert len(bus.channels) == 2
-    assert bus.mask == 3
-
-    xl_channel_config_0 = _find_xl_channel_config(
-        serial=_find_virtual_can_serial(), channel=0
-    )
-    assert xl_channel_config_0.busParams.data.can.bitRate == 1_000_000
+        event = transmit_args[4]
+        assert isinstance(event, xlclass.XLcanTxEvent)
+        assert event.tag & xldefine.XL_CANFD_TX_EventTags.XL_CAN_EV_TAG_TX_MSG
+        assert (
+            event.tagData.canMsg.msgFlags
+            & xldefine.XL_CANFD_TX_MessageFlags.XL_CAN_TXMSG_FLAG_HIGHPRIO
+        )
 
-    xl_channel_config_1 = _find_xl_channel_config(
-        serial=_find_virtual_can_serial(), channel=1
-    )
-    assert xl_channel_config_1.busParams.data.can.bitRate == 1_000_000
+    def test_shutdown_mocked(self, mock_xldriver) -> None:
+        bus = can.Bus(channel=0, interface="vector", _testing=True)
+        bus.shutdown()
+        mock_xldriver.xlDeactivateChannel.assert_called()
+        mock_xldriver.xlClosePort.assert_called()
+        mock_xldriver.xlCloseDriver.assert_called()
+
+    def test_reset_mocked(self, mock_xldriver) -> None:
+        bus = canlib.VectorBus(channel=0, interface="vector", _testing=True)
+        bus.reset()
+        mock_xldriver.xlDeactivateChannel.assert_called()
+        mock_xldriver.xlActivateChannel.assert_called()
+
+    def test_popup_hw_cfg_mocked(self, mock_xldriver) -> None:
+        mock_xldriver.xlPopupHwConfig = Mock()
+        canlib.VectorBus.popup_vector_hw_configuration(10)
+        assert mock_xldriver.xlPopupHwConfig.called
+        args, kwargs = mock_xldriver.xlPopupHwConfig.call_args
+        assert isinstance(args[0], ctypes.c_char_p)
+        assert isinstance(args[1], ctypes.c_uint)
+
+    def test_get_application_config_mocked(self, mock_xldriver) -> None:
+        mock_xldriver.xlGetApplConfig = Mock()
+        canlib.VectorBus.get_application_config(app_name="CANalyzer", app_channel=0)
+        assert mock_xldriver.xlGetApplConfig.called
+
+    def test_set_application_config_mocked(self, mock_xldriver) -> None:
+        mock_xldriver.xlSetApplConfig = Mock()
+        canlib.VectorBus.set_application_config(
+            app_name="CANalyzer",
+            app_channel=0,
+            hw_type=xldefine.XL_HardwareType.XL_HWTYPE_VN1610,
+            hw_index=0,
+            hw_channel=0,
+        )
+        assert mock_xldriver.xlSetApplConfig.called
 
-    bus.shutdown()
+    def test_set_timer_mocked(self, mock_xldriver) -> None:
+        mock_xldriver.xlSetTimerRate = Mock()
+        bus = canlib.VectorBus(channel=0, interface="vector", fd=True, _testing=True)
+        bus.set_timer_rate(timer_rate_ms=1)
+        assert mock_xldriver.xlSetTimerRate.called
 
 
-def test_bus_creation_bitrate_mocked(mock_xldriver) -> None:
-    bus = can.Bus(channel=0, interface="vector", bitrate=200_000, _testing=True)
-    assert isinstance(bus, canlib.VectorBus)
-    assert bus.protocol == can.CanProtocol.CAN_20
+class TestVectorHardware:
+    """Tests which require the Vector XL API and a virtual CAN channel."""
 
-    can.interfaces.vector.canlib.xldriver.xlOpenDriver.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlGetApplConfig.assert_called()
+    pytestmark = pytest.mark.skipif(
+        not XLDRIVER_FOUND, reason="Vector XL API is unavailable"
+    )
 
-    can.interfaces.vector.canlib.xldriver.xlOpenPort.assert_called()
-    xlOpenPort_args = can.interfaces.vector.canlib.xldriver.xlOpenPort.call_args[0]
-    assert xlOpenPort_args[5] == xldefine.XL_InterfaceVersion.XL_INTERFACE_VERSION.value
-    assert xlOpenPort_args[6] == xldefine.XL_BusTypes.XL_BUS_TYPE_CAN.value
+    def test_listen_only(self) -> None:
+        bus = can.Bus(
+            channel=0,
+            serial=_find_virtual_can_serial(),
+            interface="vector",
+            receive_own_messages=True,
+            listen_only=True,
+        )
+        assert type(bus) is canlib.VectorBus
+        assert bus.protocol == can.CanProtocol.CAN_20
 
-    can.interfaces.vector.canlib.xldriver.xlCanFdSetConfiguration.assert_not_called()
-    can.interfaces.vector.canlib.xldriver.xlCanSetChannelBitrate.assert_called()
-    xlCanSetChannelBitrate_args = (
-        can.interfaces.vector.canlib.xldriver.xlCanSetChannelBitrate.call_args[0]
-    )
-    assert xlCanSetChannelBitrate_args[2] == 200_000
+        msg = can.Message(
+            arbitration_id=0xC0FFEF, data=[1, 2, 3, 4, 5, 6, 7, 8], is_extended_id=True
+        )
 
+        bus.send(msg)
 
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_bus_creation_bitrate() -> None:
-    bus = can.Bus(
-        channel=0,
-        serial=_find_virtual_can_serial(),
-        interface="vector",
-        bitrate=200_000,
-    )
-    assert isinstance(bus, canlib.VectorBus)
-    assert bus.protocol == can.CanProtocol.CAN_20
+        received_msg = bus.recv()
 
-    xl_channel_config = _find_xl_channel_config(
-        serial=_find_virtual_can_serial(), channel=0
-    )
-    assert xl_channel_config.busParams.data.can.bitRate == 200_000
+        assert received_msg.arbitration_id == msg.arbitration_id
+        assert received_msg.data == msg.data
 
-    bus.shutdown()
+        bus.shutdown()
 
+    def test_bus_creation(self) -> None:
+        bus = can.Bus(channel=0, serial=_find_virtual_can_serial(), interface="vector")
+        assert type(bus) is canlib.VectorBus
+        assert bus.protocol == can.CanProtocol.CAN_20
 
-def test_bus_creation_fd_mocked(mock_xldriver) -> None:
-    bus = can.Bus(channel=0, interface="vector", fd=True, _testing=True)
-    assert isinstance(bus, canlib.VectorBus)
-    assert bus.protocol == can.CanProtocol.CAN_FD
+        xl_channel_config = _find_xl_channel_config(
+            serial=_find_virtual_can_serial(), channel=0
+        )
+        bus.shutdown()
 
-    can.interfaces.vector.canlib.xldriver.xlOpenDriver.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlGetApplConfig.assert_called()
+        assert bus.channel_masks[0] == xl_channel_config.channelMask
+        assert (
+            xl_channel_config.busParams.data.can.canOpMode
+            & xldefine.XL_CANFD_BusParams_CanOpMode.XL_BUS_PARAMS_CANOPMODE_CAN20
+        )
 
-    can.interfaces.vector.canlib.xldriver.xlOpenPort.assert_called()
-    xlOpenPort_args = can.interfaces.vector.canlib.xldriver.xlOpenPort.call_args[0]
-    assert (
-        xlOpenPort_args[5] == xldefine.XL_InterfaceVersion.XL_INTERFACE_VERSION_V4.value
-    )
-    assert xlOpenPort_args[6] == xldefine.XL_BusTypes.XL_BUS_TYPE_CAN.value
+        bus = canlib.VectorBus(channel=0, serial=_find_virtual_can_serial())
+        assert type(bus) is canlib.VectorBus
+        assert bus.protocol == can.CanProtocol.CAN_20
+        bus.shutdown()
 
-    can.interfaces.vector.canlib.xldriver.xlCanFdSetConfiguration.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlCanSetChannelBitrate.assert_not_called()
+    def test_bus_creation_channel_index(self) -> None:
+        channel_index = 1
+        bus = can.Bus(
+            channel=0,
+            serial=_find_virtual_can_serial(),
+            channel_index=channel_index,
+            interface="vector",
+        )
+        assert type(bus) is canlib.VectorBus
+        assert bus.protocol == can.CanProtocol.CAN_20
+        assert bus.channel_masks[0] == 1 << channel_index
 
+        bus.shutdown()
 
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_bus_creation_fd() -> None:
-    bus = can.Bus(
-        channel=0, serial=_find_virtual_can_serial(), interface="vector", fd=True
-    )
-    assert isinstance(bus, canlib.VectorBus)
-    assert bus.protocol == can.CanProtocol.CAN_FD
+    def test_bus_creation_multiple_channels(self) -> None:
+        bus = can.Bus(
+            channel="0, 1",
+            bitrate=1_000_000,
+            serial=_find_virtual_can_serial(),
+            interface="vector",
+        )
+        assert type(bus) is canlib.VectorBus
+        assert bus.protocol == can.CanProtocol.CAN_20
+        assert len(bus.channels) == 2
+        assert bus.mask == 3
 
-    xl_channel_config = _find_xl_channel_config(
-        serial=_find_virtual_can_serial(), channel=0
-    )
-    assert (
-        xl_channel_config.interfaceVersion
-        == xldefine.XL_InterfaceVersion.XL_INTERFACE_VERSION_V4
-    )
-    assert (
-        xl_channel_config.busParams.data.canFD.canOpMode
-        & xldefine.XL_CANFD_BusParams_CanOpMode.XL_BUS_PARAMS_CANOPMODE_CANFD
-    )
-    bus.shutdown()
+        xl_channel_config_0 = _find_xl_channel_config(
+            serial=_find_virtual_can_serial(), channel=0
+        )
+        assert xl_channel_config_0.busParams.data.can.bitRate == 1_000_000
 
+        xl_channel_config_1 = _find_xl_channel_config(
+            serial=_find_virtual_can_serial(), channel=1
+        )
+        assert xl_channel_config_1.busParams.data.can.bitRate == 1_000_000
 
-def test_bus_creation_fd_bitrate_timings_mocked(mock_xldriver) -> None:
-    bus = can.Bus(
-        channel=0,
-        interface="vector",
-        fd=True,
-        bitrate=500_000,
-        data_bitrate=2_000_000,
-        sjw_abr=16,
-        tseg1_abr=127,
-        tseg2_abr=32,
-        sjw_dbr=6,
-        tseg1_dbr=27,
-        tseg2_dbr=12,
-        _testing=True,
-    )
-    assert isinstance(bus, canlib.VectorBus)
-    assert bus.protocol == can.CanProtocol.CAN_FD
+        bus.shutdown()
 
-    can.interfaces.vector.canlib.xldriver.xlOpenDriver.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlGetApplConfig.assert_called()
+    def test_bus_creation_bitrate(self) -> None:
+        bus = can.Bus(
+            channel=0,
+            serial=_find_virtual_can_serial(),
+            interface="vector",
+            bitrate=200_000,
+        )
+        assert type(bus) is canlib.VectorBus
+        assert bus.protocol == can.CanProtocol.CAN_20
 
-    can.interfaces.vector.canlib.xldriver.xlOpenPort.assert_called()
-    xlOpenPort_args = can.interfaces.vector.canlib.xldriver.xlOpenPort.call_args[0]
-    assert (
-        xlOpenPort_args[5] == xldefine.XL_InterfaceVersion.XL_INTERFACE_VERSION_V4.value
-    )
+        xl_channel_config = _find_xl_channel_config(
+            serial=_find_virtual_can_serial(), channel=0
+        )
+        assert xl_channel_config.busParams.data.can.bitRate == 200_000
 
-    assert xlOpenPort_args[6] == xldefine.XL_BusTypes.XL_BUS_TYPE_CAN.value
+        bus.shutdown()
 
-    can.interfaces.vector.canlib.xldriver.xlCanFdSetConfiguration.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlCanSetChannelBitrate.assert_not_called()
+    def test_bus_creation_fd(self) -> None:
+        bus = can.Bus(
+            channel=0, serial=_find_virtual_can_serial(), interface="vector", fd=True
+        )
+        assert type(bus) is canlib.VectorBus
+        assert bus.protocol == can.CanProtocol.CAN_FD
 
-    xlCanFdSetConfiguration_args = (
-        can.interfaces.vector.canlib.xldriver.xlCanFdSetConfiguration.call_args[0]
-    )
-    canFdConf = xlCanFdSetConfiguration_args[2]
-    assert canFdConf.arbitrationBitRate == 500000
-    assert canFdConf.dataBitRate == 2000000
-    assert canFdConf.sjwAbr == 16
-    assert canFdConf.tseg1Abr == 127
-    assert canFdConf.tseg2Abr == 32
-    assert canFdConf.sjwDbr == 6
-    assert canFdConf.tseg1Dbr == 27
-    assert canFdConf.tseg2Dbr == 12
-
-
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_bus_creation_fd_bitrate_timings() -> None:
-    bus = can.Bus(
-        channel=0,
-        serial=_find_virtual_can_serial(),
-        interface="vector",
-        fd=True,
-        bitrate=500_000,
-        data_bitrate=2_000_000,
-        sjw_abr=16,
-        tseg1_abr=127,
-        tseg2_abr=32,
-        sjw_dbr=6,
-        tseg1_dbr=27,
-        tseg2_dbr=12,
-    )
+        xl_channel_config = _find_xl_channel_config(
+            serial=_find_virtual_can_serial(), channel=0
+        )
+        assert xl_channel_config.interfaceVersion == _XL_INTERFACE_VERSION_V4
+        assert xl_channel_config.busParams.data.canFD.canOpMode & _XL_CANOPMODE_CANFD
+        bus.shutdown()
 
-    xl_channel_config = _find_xl_channel_config(
-        serial=_find_virtual_can_serial(), channel=0
-    )
-    assert (
-        xl_channel_config.interfaceVersion
-        == xldefine.XL_InterfaceVersion.XL_INTERFACE_VERSION_V4
-    )
-    assert (
-        xl_channel_config.busParams.data.canFD.canOpMode
-        & xldefine.XL_CANFD_BusParams_CanOpMode.XL_BUS_PARAMS_CANOPMODE_CANFD
-    )
-    assert xl_channel_config.busParams.data.canFD.arbitrationBitRate == 500_000
-    assert xl_channel_config.busParams.data.canFD.sjwAbr == 16
-    assert xl_channel_config.busParams.data.canFD.tseg1Abr == 127
-    assert xl_channel_config.busParams.data.canFD.tseg2Abr == 32
-    assert xl_channel_config.busParams.data.canFD.sjwDbr == 6
-    assert xl_channel_config.busParams.data.canFD.tseg1Dbr == 27
-    assert xl_channel_config.busParams.data.canFD.tseg2Dbr == 12
-    assert xl_channel_config.busParams.data.canFD.dataBitRate == 2_000_000
+    def test_bus_creation_fd_bitrate_timings(self) -> None:
+        bus = can.Bus(
+            channel=0,
+            serial=_find_virtual_can_serial(),
+            interface="vector",
+            fd=True,
+            bitrate=500_000,
+            data_bitrate=2_000_000,
+            sjw_abr=16,
+            tseg1_abr=127,
+            tseg2_abr=32,
+            sjw_dbr=6,
+            tseg1_dbr=27,
+            tseg2_dbr=12,
+        )
 
-    bus.shutdown()
+        xl_channel_config = _find_xl_channel_config(
+            serial=_find_virtual_can_serial(), channel=0
+        )
+        assert xl_channel_config.interfaceVersion == _XL_INTERFACE_VERSION_V4
+        assert xl_channel_config.busParams.data.canFD.canOpMode & _XL_CANOPMODE_CANFD
+        assert xl_channel_config.busParams.data.canFD.arbitrationBitRate == 500_000
+        assert xl_channel_config.busParams.data.canFD.sjwAbr == 16
+        assert xl_channel_config.busParams.data.canFD.tseg1Abr == 127
+        assert xl_channel_config.busParams.data.canFD.tseg2Abr == 32
+        assert xl_channel_config.busParams.data.canFD.sjwDbr == 6
+        assert xl_channel_config.busParams.data.canFD.tseg1Dbr == 27
+        assert xl_channel_config.busParams.data.canFD.tseg2Dbr == 12
+        assert xl_channel_config.busParams.data.canFD.dataBitRate == 2_000_000
 
+        bus.shutdown()
 
-def test_bus_creation_timing_8mhz_mocked(mock_xldriver) -> None:
-    timing = can.BitTiming.from_bitrate_and_segments(
-        f_clock=8_000_000,
-        bitrate=125_000,
-        tseg1=13,
-        tseg2=2,
-        sjw=1,
-    )
-    bus = can.Bus(channel=0, interface="vector", timing=timing, _testing=True)
-    assert isinstance(bus, canlib.VectorBus)
-    can.interfaces.vector.canlib.xldriver.xlOpenDriver.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlGetApplConfig.assert_called()
-
-    can.interfaces.vector.canlib.xldriver.xlOpenPort.assert_called()
-    xlOpenPort_args = can.interfaces.vector.canlib.xldriver.xlOpenPort.call_args[0]
-    assert xlOpenPort_args[5] == xldefine.XL_InterfaceVersion.XL_INTERFACE_VERSION.value
-    assert xlOpenPort_args[6] == xldefine.XL_BusTypes.XL_BUS_TYPE_CAN.value
-
-    can.interfaces.vector.canlib.xldriver.xlCanFdSetConfiguration.assert_not_called()
-    can.interfaces.vector.canlib.xldriver.xlCanSetChannelParamsC200.assert_called()
-    btr0, btr1 = (
-        can.interfaces.vector.canlib.xldriver.xlCanSetChannelParamsC200.call_args[0]
-    )[2:]
-    assert btr0 == timing.btr0
-    assert btr1 == timing.btr1
-
-
-def test_bus_creation_timing_16mhz_mocked(mock_xldriver) -> None:
-    timing = can.BitTiming.from_bitrate_and_segments(
-        f_clock=16_000_000,
-        bitrate=125_000,
-        tseg1=13,
-        tseg2=2,
-        sjw=1,
+    @pytest.mark.parametrize(
+        "timing", [_TIMING_8MHZ, _TIMING_16MHZ], ids=["8mhz", "16mhz"]
     )
-    bus = can.Bus(channel=0, interface="vector", timing=timing, _testing=True)
-    assert isinstance(bus, canlib.VectorBus)
-    can.interfaces.vector.canlib.xldriver.xlOpenDriver.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlGetApplConfig.assert_called()
-
-    can.interfaces.vector.canlib.xldriver.xlOpenPort.assert_called()
-    xlOpenPort_args = can.interfaces.vector.canlib.xldriver.xlOpenPort.call_args[0]
-    assert xlOpenPort_args[5] == xldefine.XL_InterfaceVersion.XL_INTERFACE_VERSION.value
-    assert xlOpenPort_args[6] == xldefine.XL_BusTypes.XL_BUS_TYPE_CAN.value
-
-    can.interfaces.vector.canlib.xldriver.xlCanFdSetConfiguration.assert_not_called()
-    can.interfaces.vector.canlib.xldriver.xlCanSetChannelParams.assert_called()
-    chip_params = (
-        can.interfaces.vector.canlib.xldriver.xlCanSetChannelParams.call_args[0]
-    )[2]
-    assert chip_params.bitRate == 125_000
-    assert chip_params.sjw == 1
-    assert chip_params.tseg1 == 13
-    assert chip_params.tseg2 == 2
-    assert chip_params.sam == 1
-
-
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_bus_creation_timing() -> None:
-    for f_clock in [8_000_000, 16_000_000]:
-        timing = can.BitTiming.from_bitrate_and_segments(
-            f_clock=f_clock,
-            bitrate=125_000,
-            tseg1=13,
-            tseg2=2,
-            sjw=1,
-        )
+    def test_bus_creation_timing(self, timing) -> None:
         bus = can.Bus(
             channel=0,
             serial=_find_virtual_can_serial(),
             interface="vector",
             timing=timing,
         )
-        assert isinstance(bus, canlib.VectorBus)
+        assert type(bus) is canlib.VectorBus
         assert bus.protocol == can.CanProtocol.CAN_20
 
         xl_channel_config = _find_xl_channel_config(
@@ -452,404 +566,185 @@ def test_bus_creation_timing() -> None:
 
         bus.shutdown()
 
+    def test_bus_creation_timingfd(self) -> None:
+        bus = can.Bus(
+            channel=0,
+            serial=_find_virtual_can_serial(),
+            interface="vector",
+            timing=_TIMING_FD_80MHZ,
+        )
 
-def test_bus_creation_timingfd_mocked(mock_xldriver) -> None:
-    timing = can.BitTimingFd.from_bitrate_and_segments(
-        f_clock=80_000_000,
-        nom_bitrate=500_000,
-        nom_tseg1=68,
-        nom_tseg2=11,
-        nom_sjw=10,
-        data_bitrate=2_000_000,
-        data_tseg1=10,
-        data_tseg2=9,
-        data_sjw=8,
-    )
-    bus = can.Bus(
-        channel=0,
-        interface="vector",
-        timing=timing,
-        _testing=True,
-    )
-    assert isinstance(bus, canlib.VectorBus)
-    assert bus.protocol == can.CanProtocol.CAN_FD
-
-    can.interfaces.vector.canlib.xldriver.xlOpenDriver.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlGetApplConfig.assert_called()
-
-    can.interfaces.vector.canlib.xldriver.xlOpenPort.assert_called()
-    xlOpenPort_args = can.interfaces.vector.canlib.xldriver.xlOpenPort.call_args[0]
-    assert (
-        xlOpenPort_args[5] == xldefine.XL_InterfaceVersion.XL_INTERFACE_VERSION_V4.value
-    )
-
-    assert xlOpenPort_args[6] == xldefine.XL_BusTypes.XL_BUS_TYPE_CAN.value
-
-    can.interfaces.vector.canlib.xldriver.xlCanFdSetConfiguration.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlCanSetChannelBitrate.assert_not_called()
-
-    xlCanFdSetConfiguration_args = (
-        can.interfaces.vector.canlib.xldriver.xlCanFdSetConfiguration.call_args[0]
-    )
-    canFdConf = xlCanFdSetConfiguration_args[2]
-    assert canFdConf.arbitrationBitRate == 500_000
-    assert canFdConf.dataBitRate == 2_000_000
-    assert canFdConf.sjwAbr == 10
-    assert canFdConf.tseg1Abr == 68
-    assert canFdConf.tseg2Abr == 11
-    assert canFdConf.sjwDbr == 8
-    assert canFdConf.tseg1Dbr == 10
-    assert canFdConf.tseg2Dbr == 9
-
-
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_bus_creation_timingfd() -> None:
-    timing = can.BitTimingFd.from_bitrate_and_segments(
-        f_clock=80_000_000,
-        nom_bitrate=500_000,
-        nom_tseg1=68,
-        nom_tseg2=11,
-        nom_sjw=10,
-        data_bitrate=2_000_000,
-        data_tseg1=10,
-        data_tseg2=9,
-        data_sjw=8,
-    )
-    bus = can.Bus(
-        channel=0,
-        serial=_find_virtual_can_serial(),
-        interface="vector",
-        timing=timing,
-    )
-
-    assert bus.protocol == can.CanProtocol.CAN_FD
-
-    xl_channel_config = _find_xl_channel_config(
-        serial=_find_virtual_can_serial(), channel=0
-    )
-    assert (
-        xl_channel_config.interfaceVersion
-        == xldefine.XL_InterfaceVersion.XL_INTERFACE_VERSION_V4
-    )
-    assert (
-        xl_channel_config.busParams.data.canFD.canOpMode
-        & xldefine.XL_CANFD_BusParams_CanOpMode.XL_BUS_PARAMS_CANOPMODE_CANFD
-    )
-    assert xl_channel_config.busParams.data.canFD.arbitrationBitRate == 500_000
-    assert xl_channel_config.busParams.data.canFD.sjwAbr == 10
-    assert xl_channel_config.busParams.data.canFD.tseg1Abr == 68
-    assert xl_channel_config.busParams.data.canFD.tseg2Abr == 11
-    assert xl_channel_config.busParams.data.canFD.sjwDbr == 8
-    assert xl_channel_config.busParams.data.canFD.tseg1Dbr == 10
-    assert xl_channel_config.busParams.data.canFD.tseg2Dbr == 9
-    assert xl_channel_config.busParams.data.canFD.dataBitRate == 2_000_000
-
-    bus.shutdown()
-
-
-def test_send_mocked(mock_xldriver) -> None:
-    bus = can.Bus(channel=0, interface="vector", _testing=True)
-    msg = can.Message(
-        arbitration_id=0xC0FFEF, data=[1, 2, 3, 4, 5, 6, 7, 8], is_extended_id=True
-    )
-    bus.send(msg)
-    can.interfaces.vector.canlib.xldriver.xlCanTransmit.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlCanTransmitEx.assert_not_called()
-
-
-def test_send_fd_mocked(mock_xldriver) -> None:
-    bus = can.Bus(channel=0, interface="vector", fd=True, _testing=True)
-    msg = can.Message(
-        arbitration_id=0xC0FFEF, data=[1, 2, 3, 4, 5, 6, 7, 8], is_extended_id=True
-    )
-    bus.send(msg)
-    can.interfaces.vector.canlib.xldriver.xlCanTransmit.assert_not_called()
-    can.interfaces.vector.canlib.xldriver.xlCanTransmitEx.assert_called()
-
-
-def test_receive_mocked(mock_xldriver) -> None:
-    can.interfaces.vector.canlib.xldriver.xlReceive = Mock(side_effect=xlReceive)
-    bus = can.Bus(channel=0, interface="vector", _testing=True)
-    bus.recv(timeout=0.05)
-    can.interfaces.vector.canlib.xldriver.xlReceive.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlCanReceive.assert_not_called()
-
-
-def test_receive_fd_mocked(mock_xldriver) -> None:
-    can.interfaces.vector.canlib.xldriver.xlCanReceive = Mock(side_effect=xlCanReceive)
-    bus = can.Bus(channel=0, interface="vector", fd=True, _testing=True)
-    bus.recv(timeout=0.05)
-    can.interfaces.vector.canlib.xldriver.xlReceive.assert_not_called()
-    can.interfaces.vector.canlib.xldriver.xlCanReceive.assert_called()
-
-
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_send_and_receive() -> None:
-    bus1 = can.Bus(channel=0, serial=_find_virtual_can_serial(), interface="vector")
-    bus2 = can.Bus(channel=0, serial=_find_virtual_can_serial(), interface="vector")
-
-    msg_std = can.Message(
-        channel=0, arbitration_id=0xFF, data=list(range(8)), is_extended_id=False
-    )
-    msg_ext = can.Message(
-        channel=0, arbitration_id=0xFFFFFF, data=list(range(8)), is_extended_id=True
-    )
-
-    bus1.send(msg_std)
-    msg_std_recv = bus2.recv(None)
-    assert msg_std.equals(msg_std_recv, timestamp_delta=None)
-
-    bus1.send(msg_ext)
-    msg_ext_recv = bus2.recv(None)
-    assert msg_ext.equals(msg_ext_recv, timestamp_delta=None)
-
-    bus1.shutdown()
-    bus2.shutdown()
-
-
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_send_and_receive_fd() -> None:
-    bus1 = can.Bus(
-        channel=0, serial=_find_virtual_can_serial(), fd=True, interface="vector"
-    )
-    bus2 = can.Bus(
-        channel=0, serial=_find_virtual_can_serial(), fd=True, interface="vector"
-    )
-
-    msg_std = can.Message(
-        channel=0,
-        arbitration_id=0xFF,
-        data=list(range(64)),
-        is_extended_id=False,
-        is_fd=True,
-    )
-    msg_ext = can.Message(
-        channel=0,
-        arbitration_id=0xFFFFFF,
-        data=list(range(64)),
-        is_extended_id=True,
-        is_fd=True,
-    )
-
-    bus1.send(msg_std)
-    msg_std_recv = bus2.recv(None)
-    assert msg_std.equals(msg_std_recv, timestamp_delta=None)
-
-    bus1.send(msg_ext)
-    msg_ext_recv = bus2.recv(None)
-    assert msg_ext.equals(msg_ext_recv, timestamp_delta=None)
-
-    bus1.shutdown()
-    bus2.shutdown()
-
-
-def test_receive_non_msg_event_mocked(mock_xldriver) -> None:
-    can.interfaces.vector.canlib.xldriver.xlReceive = Mock(
-        side_effect=xlReceive_chipstate
-    )
-    bus = can.Bus(channel=0, interface="vector", _testing=True)
-    bus.handle_can_event = Mock()
-    bus.recv(timeout=0.05)
-    can.interfaces.vector.canlib.xldriver.xlReceive.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlCanReceive.assert_not_called()
-    bus.handle_can_event.assert_called()
-
-
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_receive_non_msg_event() -> None:
-    bus = canlib.VectorBus(
-        channel=0, serial=_find_virtual_can_serial(), interface="vector"
-    )
-    bus.handle_can_event = Mock()
-    bus.xldriver.xlCanRequestChipState(bus.port_handle, bus.channel_masks[0])
-    bus.recv(timeout=0.5)
-    bus.handle_can_event.assert_called()
-    bus.shutdown()
-
-
-def test_receive_fd_non_msg_event_mocked(mock_xldriver) -> None:
-    can.interfaces.vector.canlib.xldriver.xlCanReceive = Mock(
-        side_effect=xlCanReceive_chipstate
-    )
-    bus = can.Bus(channel=0, interface="vector", fd=True, _testing=True)
-    bus.handle_canfd_event = Mock()
-    bus.recv(timeout=0.05)
-    can.interfaces.vector.canlib.xldriver.xlReceive.assert_not_called()
-    can.interfaces.vector.canlib.xldriver.xlCanReceive.assert_called()
-    bus.handle_canfd_event.assert_called()
-
-
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_receive_fd_non_msg_event() -> None:
-    bus = canlib.VectorBus(
-        channel=0, serial=_find_virtual_can_serial(), fd=True, interface="vector"
-    )
-    bus.handle_canfd_event = Mock()
-    bus.xldriver.xlCanRequestChipState(bus.port_handle, bus.channel_masks[0])
-    bus.recv(timeout=0.5)
-    bus.handle_canfd_event.assert_called()
-    bus.shutdown()
+        assert bus.protocol == can.CanProtocol.CAN_FD
 
+        xl_channel_config = _find_xl_channel_config(
+            serial=_find_virtual_can_serial(), channel=0
+        )
+        assert xl_channel_config.interfaceVersion == _XL_INTERFACE_VERSION_V4
+        assert xl_channel_config.busParams.data.canFD.canOpMode & _XL_CANOPMODE_CANFD
+        assert xl_channel_config.busParams.data.canFD.arbitrationBitRate == 500_000
+        assert xl_channel_config.busParams.data.canFD.sjwAbr == 10
+        assert xl_channel_config.busParams.data.canFD.tseg1Abr == 68
+        assert xl_channel_config.busParams.data.canFD.tseg2Abr == 11
+        assert xl_channel_config.busParams.data.canFD.sjwDbr == 8
+        assert xl_channel_config.busParams.data.canFD.tseg1Dbr == 10
+        assert xl_channel_config.busParams.data.canFD.tseg2Dbr == 9
+        assert xl_channel_config.busParams.data.canFD.dataBitRate == 2_000_000
 
-def test_flush_tx_buffer_mocked(mock_xldriver) -> None:
-    bus = can.Bus(channel=0, interface="vector", _testing=True)
-    bus.flush_tx_buffer()
-    transmit_args = can.interfaces.vector.canlib.xldriver.xlCanTransmit.call_args[0]
+        bus.shutdown()
 
-    num_msg = transmit_args[2]
-    assert num_msg.value == ctypes.c_uint(1).value
+    def test_send_and_receive(self) -> None:
+        bus1 = can.Bus(channel=0, serial=_find_virtual_can_serial(), interface="vector")
+        bus2 = can.Bus(channel=0, serial=_find_virtual_can_serial(), interface="vector")
 
-    event = transmit_args[3]
-    assert isinstance(event, xlclass.XLevent)
-    assert event.tag & xldefine.XL_EventTags.XL_TRANSMIT_MSG
-    assert event.tagData.msg.flags & (
-        xldefine.XL_MessageFlags.XL_CAN_MSG_FLAG_OVERRUN
-        | xldefine.XL_MessageFlags.XL_CAN_MSG_FLAG_WAKEUP
-    )
+        msg_std = can.Message(
+            channel=0, arbitration_id=0xFF, data=bytes(range(8)), is_extended_id=False
+        )
+        msg_ext = can.Message(
+            channel=0,
+            arbitration_id=0xFFFFFF,
+            data=bytes(range(8)),
+            is_extended_id=True,
+        )
 
+        bus1.send(msg_std)
+        bus1.send(msg_ext)
 
-def test_flush_tx_buffer_fd_mocked(mock_xldriver) -> None:
-    bus = can.Bus(channel=0, interface="vector", fd=True, _testing=True)
-    bus.flush_tx_buffer()
-    transmit_args = can.interfaces.vector.canlib.xldriver.xlCanTransmitEx.call_args[0]
+        msg_std_recv = bus2.recv(None)
+        msg_ext_recv = bus2.recv(None)
+        assert msg_std.equals(msg_std_recv, timestamp_delta=None)
+        assert msg_ext.equals(msg_ext_recv, timestamp_delta=None)
 
-    num_msg = transmit_args[2]
-    assert num_msg.value == ctypes.c_uint(1).value
+        bus1.shutdown()
+        bus2.shutdown()
 
-    num_msg_sent = transmit_args[3]
-    assert num_msg_sent.value == ctypes.c_uint(0).value
+    def test_send_and_receive_fd(self) -> None:
+        bus1 = can.Bus(
+            channel=0, serial=_find_virtual_can_serial(), fd=True, interface="vector"
+        )
+        bus2 = can.Bus(
+            channel=0, serial=_find_virtual_can_serial(), fd=True, interface="vector"
+        )
 
-    event = transmit_args[4]
-    assert isinstance(event, xlclass.XLcanTxEvent)
-    assert event.tag & xldefine.XL_CANFD_TX_EventTags.XL_CAN_EV_TAG_TX_MSG
-    assert (
-        event.tagData.canMsg.msgFlags
-        & xldefine.XL_CANFD_TX_MessageFlags.XL_CAN_TXMSG_FLAG_HIGHPRIO
-    )
+        msg_std = can.Message(
+            channel=0,
+            arbitration_id=0xFF,
+            data=bytes(range(64)),
+            is_extended_id=False,
+            is_fd=True,
+        )
+        msg_ext = can.Message(
+            channel=0,
+            arbitration_id=0xFFFFFF,
+            data=bytes(range(64)),
+            is_extended_id=True,
+            is_fd=True,
+        )
 
+        bus1.send(msg_std)
+        bus1.send(msg_ext)
 
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_flush_tx_buffer() -> None:
-    bus = can.Bus(channel=0, serial=_find_virtual_can_serial(), interface="vector")
-    bus.flush_tx_buffer()
-    bus.shutdown()
+        msg_std_recv = bus2.recv(None)
+        msg_ext_recv = bus2.recv(None)
+        assert msg_std.equals(msg_std_recv, timestamp_delta=None)
+        assert msg_ext.equals(msg_ext_recv, timestamp_delta=None)
 
+        bus1.shutdown()
+        bus2.shutdown()
 
-def test_shutdown_mocked(mock_xldriver) -> None:
-    bus = can.Bus(channel=0, interface="vector", _testing=True)
-    bus.shutdown()
-    can.interfaces.vector.canlib.xldriver.xlDeactivateChannel.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlClosePort.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlCloseDriver.assert_called()
+    def test_receive_fd_non_msg_event(self) -> None:
+        bus = canlib.VectorBus(
+            channel=0, serial=_find_virtual_can_serial(), fd=True, interface="vector"
+        )
+        with patch.object(bus, "handle_canfd_event") as handle_canfd_event:
+            bus.xldriver.xlCanRequestChipState(bus.port_handle, bus.channel_masks[0])
+            bus.recv(timeout=0.5)
+        handle_canfd_event.assert_called()
+        bus.shutdown()
 
+    def test_shutdown(self) -> None:
+        bus = can.Bus(channel=0, serial=_find_virtual_can_serial(), interface="vector")
 
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_shutdown() -> None:
-    bus = can.Bus(channel=0, serial=_find_virtual_can_serial(), interface="vector")
+        xl_channel_config = _find_xl_channel_config(
+            serial=_find_virtual_can_serial(), channel=0
+        )
+        assert xl_channel_config.isOnBus != 0
+        bus.shutdown()
 
-    xl_channel_config = _find_xl_channel_config(
-        serial=_find_virtual_can_serial(), channel=0
-    )
-    assert xl_channel_config.isOnBus != 0
-    bus.shutdown()
+        xl_channel_config = _find_xl_channel_config(
+            serial=_find_virtual_can_serial(), channel=0
+        )
+        assert xl_channel_config.isOnBus == 0
 
-    xl_channel_config = _find_xl_channel_config(
-        serial=_find_virtual_can_serial(), channel=0
-    )
-    assert xl_channel_config.isOnBus == 0
+    def test_popup_hw_cfg(self) -> None:
+        with pytest.raises(VectorOperationError):
+            canlib.VectorBus.popup_vector_hw_configuration(1)
 
+    def test_set_and_get_application_config(self) -> None:
+        xl_channel_config = _find_xl_channel_config(
+            serial=_find_virtual_can_serial(), channel=1
+        )
+        canlib.VectorBus.set_application_config(
+            app_name="python-can::test_vector",
+            app_channel=5,
+            hw_channel=xl_channel_config.hwChannel,
+            hw_index=xl_channel_config.hwIndex,
+            hw_type=xldefine.XL_HardwareType(xl_channel_config.hwType),
+        )
+        hw_type, hw_index, hw_channel = canlib.VectorBus.get_application_config(
+            app_name="python-can::test_vector",
+            app_channel=5,
+        )
+        assert hw_type == xldefine.XL_HardwareType(xl_channel_config.hwType)
+        assert hw_index == xl_channel_config.hwIndex
+        assert hw_channel == xl_channel_config.hwChannel
 
-def test_reset_mocked(mock_xldriver) -> None:
-    bus = canlib.VectorBus(channel=0, interface="vector", _testing=True)
-    bus.reset()
-    can.interfaces.vector.canlib.xldriver.xlDeactivateChannel.assert_called()
-    can.interfaces.vector.canlib.xldriver.xlActivateChannel.assert_called()
 
+@pytest.fixture(scope="class")
+def vector_bus() -> Iterator[canlib.VectorBus]:
+    """Bus shared by the tests of TestVectorHardwareSharedBus.
 
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_reset() -> None:
-    bus = canlib.VectorBus(
-        channel=0, serial=_find_virtual_can_serial(), interface="vector"
-    )
-    bus.reset()
+    It is closed after the class, before any other test opens channel 0.
+    """
+    bus = canlib.VectorBus(channel=0, serial=_find_virtual_can_serial())
+    yield bus
     bus.shutdown()
 
 
-def test_popup_hw_cfg_mocked(mock_xldriver) -> None:
-    canlib.xldriver.xlPopupHwConfig = Mock()
-    canlib.VectorBus.popup_vector_hw_configuration(10)
-    assert canlib.xldriver.xlPopupHwConfig.called
-    args, kwargs = canlib.xldriver.xlPopupHwConfig.call_args
-    assert isinstance(args[0], ctypes.c_char_p)
-    assert isinstance(args[1], ctypes.c_uint)
-
-
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_popup_hw_cfg() -> None:
-    with pytest.raises(VectorOperationError):
-        canlib.VectorBus.popup_vector_hw_configuration(1)
-
+class TestVectorHardwareSharedBus:
+    """Hardware tests which do not test bus creation and share one bus."""
 
-def test_get_application_config_mocked(mock_xldriver) -> None:
-    canlib.xldriver.xlGetApplConfig = Mock()
-    canlib.VectorBus.get_application_config(app_name="CANalyzer", app_channel=0)
-    assert canlib.xldriver.xlGetApplConfig.called
-
-
-def test_set_application_config_mocked(mock_xldriver) -> None:
-    canlib.xldriver.xlSetApplConfig = Mock()
-    canlib.VectorBus.set_application_config(
-        app_name="CANalyzer",
-        app_channel=0,
-        hw_type=xldefine.XL_HardwareType.XL_HWTYPE_VN1610,
-        hw_index=0,
-        hw_channel=0,
+    pytestmark = pytest.mark.skipif(
+        not XLDRIVER_FOUND, reason="Vector XL API is unavailable"
     )
-    assert canlib.xldriver.xlSetApplConfig.called
 
+    def test_receive_non_msg_event(self, vector_bus) -> None:
+        with patch.object(vector_bus, "handle_can_event") as handle_can_event:
+            vector_bus.xldriver.xlCanRequestChipState(
+                vector_bus.port_handle, vector_bus.channel_masks[0]
+            )
+            vector_bus.recv(timeout=0.5)
+        handle_can_event.assert_called()
 
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_set_and_get_application_config() -> None:
-    xl_channel_config = _find_xl_channel_config(
-        serial=_find_virtual_can_serial(), channel=1
-    )
-    canlib.VectorBus.set_application_config(
-        app_name="python-can::test_vector",
-        app_channel=5,
-        hw_channel=xl_channel_config.hwChannel,
-        hw_index=xl_channel_config.hwIndex,
-        hw_type=xldefine.XL_HardwareType(xl_channel_config.hwType),
-    )
-    hw_type, hw_index, hw_channel = canlib.VectorBus.get_application_config(
-        app_name="python-can::test_vector",
-        app_channel=5,
-    )
-    assert hw_type == xldefine.XL_HardwareType(xl_channel_config.hwType)
-    assert hw_index == xl_channel_config.hwIndex
-    assert hw_channel == xl_channel_config.hwChannel
-
+    def test_flush_tx_buffer(self, vector_bus) -> None:
+        vector_bus.flush_tx_buffer()
 
-def test_set_timer_mocked(mock_xldriver) -> None:
-    canlib.xldriver.xlSetTimerRate = Mock()
-    bus = canlib.VectorBus(channel=0, interface="vector", fd=True, _testing=True)
-    bus.set_timer_rate(timer_rate_ms=1)
-    assert canlib.xldriver.xlSetTimerRate.called
+    def test_reset(self, vector_bus) -> None:
+        vector_bus.reset()
 
+    def test_set_timer(self, vector_bus) -> None:
+        with patch.object(vector_bus, "handle_can_event"):
+            vector_bus.set_timer_rate(timer_rate_ms=1)
+            try:
+                deadline = time.monotonic_ns() + 500_000_000
+                while time.monotonic_ns() < deadline:
+                    vector_bus.recv(timeout=-1)
+            finally:
+                # the bus is shared, deactivate the timer events again
+                vector_bus.set_timer_rate(timer_rate_ms=0)
 
-@pytest.mark.skipif(not XLDRIVER_FOUND, reason="Vector XL API is unavailable")
-def test_set_timer() -> None:
-    bus = canlib.VectorBus(
-        channel=0, serial=_find_virtual_can_serial(), interface="vector"
-    )
-    bus.handle_can_event = Mock()
-    bus.set_timer_rate(timer_rate_ms=1)
-    t0 = time.perf_counter()
-    while time.perf_counter() - t0 < 0.5:
-        bus.recv(timeout=-1)
-
-    # call_count is incorrect when using virtual bus
-    # assert bus.handle_can_event.call_count > 498
-    # assert bus.handle_can_event.call_count < 502
+            # call_count is incorrect when using virtual bus
+            # assert vector_bus.handle_can_event.call_count > 498
+            # assert vector_bus.handle_can_event.call_count < 502
 
 
 @pytest.mark.skipif(IS_WINDOWS, reason="Not relevant for Windows.")
@@ -860,45 +755,43 @@ def test_called_without_testing_argument() -> None:
         can.Bus(channel=0, interface="vector")
 
 
-def test_vector_error_pickle() -> None:
-    for error_type in [
-        VectorError,
-        VectorInitializationError,
-        VectorOperationError,
-    ]:
-        error_code = 118
-        error_string = "XL_ERROR"
-        function = "function_name"
-
-        exc = error_type(error_code, error_string, function)
+@pytest.mark.parametrize(
+    "error_type", [VectorError, VectorInitializationError, VectorOperationError]
+)
+def test_vector_error_pickle(error_type) -> None:
+    error_code = 118
+    error_string = "XL_ERROR"
+    function = "function_name"
 
-        # pickle and unpickle
-        p = pickle.dumps(exc)
-        exc_unpickled: VectorError = pickle.loads(p)
+    exc = error_type(error_code, error_string, function)
 
-        assert str(exc) == str(exc_unpickled)
-        assert error_code == exc_unpickled.error_code
+    # pickle and unpickle
+    p = pickle.dumps(exc)
+    exc_unpickled: VectorError = pickle.loads(p)
 
-        with pytest.raises(error_type):
-            raise exc_unpickled
+    assert str(exc) == str(exc_unpickled)
+    assert error_code == exc_unpickled.error_code
 
+    with pytest.raises(error_type):
+        raise exc_unpickled
 
-def test_vector_subtype_error_from_generic() -> None:
-    for error_type in [VectorInitializationError, VectorOperationError]:
-        error_code = 118
-        error_string = "XL_ERROR"
-        function = "function_name"
 
-        generic = VectorError(error_code, error_string, function)
+@pytest.mark.parametrize(
+    "error_type", [VectorInitializationError, VectorOperationError]
+)
+def test_vector_subtype_error_from_generic(error_type) -> None:
+    error_code = 118
+    error_string = "XL_ERROR"
+    function = "function_name"
 
-        # pickle and unpickle
-        specific: VectorError = error_type.from_generic(generic)
+    generic = VectorError(error_code, error_string, function)
+    specific: VectorError = error_type.from_generic(generic)
 
-        assert str(generic) == str(specific)
-        assert error_code == specific.error_code
+    assert str(generic) == str(specific)
+    assert error_code == specific.error_code
 
-        with pytest.raises(error_type):
-            raise specific
+    with pytest.raises(error_type):
+        raise specific
 
 
 def test_iterate_channel_index() -> None:
@@ -907,26 +800,26 @@ def test_iterate_channel_index() -> None:
     assert channels == [0, 1, 5]
 
 
+@pytest.fixture
+def predefined_xl_driver_config(monkeypatch) -> None:
+    """Let canlib read XL_DRIVER_CONFIG_EXAMPLE instead of the real driver."""
+    monkeypatch.setattr(
+        canlib, "_get_xl_driver_config", _get_predefined_xl_driver_config
+    )
+
+
 @pytest.mark.skipif(
     sys.byteorder != "little", reason="Test relies on little endian data."
 )
-def test_get_channel_configs() -> None:
-    _original_func = canlib._get_xl_driver_config
-    canlib._get_xl_driver_config = _get_predefined_xl_driver_config
-
+def test_get_channel_configs(predefined_xl_driver_config) -> None:
     channel_configs = canlib.get_channel_configs()
     assert len(channel_configs) == 12
 
-    canlib._get_xl_driver_config = _original_func
-
 
 @pytest.mark.skipif(
     sys.byteorder != "little", reason="Test relies on little endian data."
 )
-def test_detect_available_configs() -> None:
-    _original_func = canlib._get_xl_driver_config
-    canlib._get_xl_driver_config = _get_predefined_xl_driver_config
-
+def test_detect_available_configs(predefined_xl_driver_config) -> None:
     available_configs = canlib.VectorBus._detect_available_configs()
 
     assert len(available_configs) == 5
@@ -942,8 +835,6 @@ def test_detect_available_configs() -> None:
         available_configs[0]["vector_channel_config"], VectorChannelConfig
     )
 
-    canlib._get_xl_driver_config = _original_func
-
 
 @pytest.mark.skipif(not IS_WINDOWS, reason="Windows specific test")
 def test_winapi_availability() -> None:
@@ -952,50 +843,58 @@ def test_winapi_availability() -> None:
 
 
 def test_vector_channel_config_attributes():
-    assert hasattr(VectorChannelConfig, "name")
-    assert hasattr(VectorChannelConfig, "hw_type")
-    assert hasattr(VectorChannelConfig, "hw_index")
-    assert hasattr(VectorChannelConfig, "hw_channel")
-    assert hasattr(VectorChannelConfig, "channel_index")
-    assert hasattr(VectorChannelConfig, "channel_mask")
-    assert hasattr(VectorChannelConfig, "channel_capabilities")
-    assert hasattr(VectorChannelConfig, "channel_bus_capabilities")
-    assert hasattr(VectorChannelConfig, "is_on_bus")
-    assert hasattr(VectorChannelConfig, "bus_params")
-    assert hasattr(VectorChannelConfig, "connected_bus_type")
-    assert hasattr(VectorChannelConfig, "serial_number")
-    assert hasattr(VectorChannelConfig, "article_number")
-    assert hasattr(VectorChannelConfig, "transceiver_name")
+    assert {
+        "name",
+        "hw_type",
+        "hw_index",
+        "hw_channel",
+        "channel_index",
+        "channel_mask",
+        "channel_capabilities",
+        "channel_bus_capabilities",
+        "is_on_bus",
+        "bus_params",
+        "connected_bus_type",
+        "serial_number",
+        "article_number",
+        "transceiver_name",
+    } <= set(VectorChannelConfig._fields)
 
 
 def test_vector_bus_params_attributes():
-    assert hasattr(VectorBusParams, "bus_type")
-    assert hasattr(VectorBusParams, "can")
-    assert hasattr(VectorBusParams, "canfd")
+    assert {
+        "bus_type",
+        "can",
+        "canfd",
+    } <= set(VectorBusParams._fields)
 
 
 def test_vector_can_params_attributes():
-    assert hasattr(VectorCanParams, "bitrate")
-    assert hasattr(VectorCanParams, "sjw")
-    assert hasattr(VectorCanParams, "tseg1")
-    assert hasattr(VectorCanParams, "tseg2")
-    assert hasattr(VectorCanParams, "sam")
-    assert hasattr(VectorCanParams, "output_mode")
-    assert hasattr(VectorCanParams, "can_op_mode")
+    assert {
+        "bitrate",
+        "sjw",
+        "tseg1",
+        "tseg2",
+        "sam",
+        "output_mode",
+        "can_op_mode",
+    } <= set(VectorCanParams._fields)
 
 
 def test_vector_canfd_params_attributes():
-    assert hasattr(VectorCanFdParams, "bitrate")
-    assert hasattr(VectorCanFdParams, "data_bitrate")
-    assert hasattr(VectorCanFdParams, "sjw_abr")
-    assert hasattr(VectorCanFdParams, "tseg1_abr")
-    assert hasattr(VectorCanFdParams, "tseg2_abr")
-    assert hasattr(VectorCanFdParams, "sam_abr")
-    assert hasattr(VectorCanFdParams, "sjw_dbr")
-    assert hasattr(VectorCanFdParams, "tseg1_dbr")
-    assert hasattr(VectorCanFdParams, "tseg2_dbr")
-    assert hasattr(VectorCanFdParams, "output_mode")
-    assert hasattr(VectorCanFdParams, "can_op_mode")
+    assert {
+        "bitrate",
+        "data_bitrate",
+        "sjw_abr",
+        "tseg1_abr",
+        "tseg2_abr",
+        "sam_abr",
+        "sjw_dbr",
+        "tseg1_dbr",
+        "tseg2_dbr",
+        "output_mode",
+        "can_op_mode",
+    } <= set(VectorCanFdParams._fields)
 
 
 # *****************************************************************************
@@ -1003,16 +902,25 @@ def test_vector_canfd_params_attributes():
 # *****************************************************************************
 
 
+def _assert_open_port(
+    xldriver_mock: Mock, interface_version: int, bus_type: int = _XL_BUS_TYPE_CAN
+) -> None:
+    """Check the interface version and bus type passed to ``xlOpenPort``."""
+    xldriver_mock.xlOpenPort.assert_called()
+    xlOpenPort_args = xldriver_mock.xlOpenPort.call_args[0]
+    assert xlOpenPort_args[5] == interface_version
+    assert xlOpenPort_args[6] == bus_type
+
+
 def _find_xl_channel_config(serial: int, channel: int) -> xlclass.XLchannelConfig:
-    """Helper function"""
-    xl_driver_config = xlclass.XLdriverConfig()
-    canlib.xldriver.xlOpenDriver()
-    canlib.xldriver.xlGetDriverConfig(xl_driver_config)
-    canlib.xldriver.xlCloseDriver()
+    """Read the current channel config from the driver.
 
-    for i in range(xl_driver_config.channelCount):
-        xl_channel_config: xlclass.XLchannelConfig = xl_driver_config.channel[i]
+    This must not be cached, the tests use it to check the bus state.
+    """
+    xl_driver_config = canlib._get_xl_driver_config()
+    channel_count = xl_driver_config.channelCount
 
+    for xl_channel_config in xl_driver_config.channel[:channel_count]:
         if xl_channel_config.serialNumber != serial:
             continue
 
@@ -1027,20 +935,17 @@ def _find_xl_channel_config(serial: int, channel: int) -> xlclass.XLchannelConfi
 @functools.lru_cache
 def _find_virtual_can_serial() -> int:
     """Serial number might be 0 or 100 depending on driver version."""
-    xl_driver_config = xlclass.XLdriverConfig()
-    canlib.xldriver.xlOpenDriver()
-    canlib.xldriver.xlGetDriverConfig(xl_driver_config)
-    canlib.xldriver.xlCloseDriver()
-
-    for i in range(xl_driver_config.channelCount):
-        xl_channel_config: xlclass.XLchannelConfig = xl_driver_config.channel[i]
+    xl_driver_config = canlib._get_xl_driver_config()
+    channel_count = xl_driver_config.channelCount
 
-        if "Virtual CAN" in xl_channel_config.transceiverName.decode():
+    for xl_channel_config in xl_driver_config.channel[:channel_count]:
+        if b"Virtual CAN" in xl_channel_config.transceiverName:
             return xl_channel_config.serialNumber
 
     raise LookupError("Vector virtual CAN not found")
 
 
+# the remaining channel configs are zeroed, ljust adds them up to the struct size
 XL_DRIVER_CONFIG_EXAMPLE = (
     b"\x0e\x00\x1e\x14\x0c\x00\x00\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
     b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
@@ -1179,11 +1084,13 @@ XL_DRIVER_CONFIG_EXAMPLE = (
     b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
     b"\x56\x69\x72\x74\x75\x61\x6c\x20\x43\x41\x4e\x00\x00\x00\x00\x00\x00\x00\x00\x00"
     b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00"
-    b"\x00\x00\x00\x02" + 11832 * b"\x00"
-)
+    b"\x00\x00\x00\x02"
+).ljust(ctypes.sizeof(xlclass.XLdriverConfig), b"\x00")
 
 
+@functools.lru_cache
 def _get_predefined_xl_driver_config() -> xlclass.XLdriverConfig:
+    """The returned config is shared between tests and must not be modified."""
     return xlclass.XLdriverConfig.from_buffer_copy(XL_DRIVER_CONFIG_EXAMPLE)
 
 
@@ -1241,33 +1148,40 @@ def xlSetNotification(
     return 0
 
 
+_XL_RECEIVE_MSG = xldefine.XL_EventTags.XL_RECEIVE_MSG.value
+_XL_CAN_EV_TAG_RX_OK = xldefine.XL_CANFD_RX_EventTags.XL_CAN_EV_TAG_RX_OK.value
+_XL_CHIP_STATE = xldefine.XL_EventTags.XL_CHIP_STATE.value
+_XL_CAN_EV_TAG_CHIP_STATE = (
+    xldefine.XL_CANFD_RX_EventTags.XL_CAN_EV_TAG_CHIP_STATE.value
+)
+_RX_PAYLOAD = bytes([1, 2, 3, 4, 5, 6, 7, 8])
+
+
 def xlReceive(
     port_handle: xlclass.XLportHandle,
     event_count_p: ctypes.POINTER(ctypes.c_uint),
     event: ctypes.POINTER(xlclass.XLevent),
 ) -> int:
-    event.tag = xldefine.XL_EventTags.XL_RECEIVE_MSG.value
+    event.tag = _XL_RECEIVE_MSG
     event.tagData.msg.id = 0x123
     event.tagData.msg.dlc = 8
     event.tagData.msg.flags = 0
     event.timeStamp = 0
     event.chanIndex = 0
-    for idx, value in enumerate([1, 2, 3, 4, 5, 6, 7, 8]):
-        event.tagData.msg.data[idx] = value
+    ctypes.memmove(event.tagData.msg.data, _RX_PAYLOAD, len(_RX_PAYLOAD))
     return 0
 
 
 def xlCanReceive(
     port_handle: xlclass.XLportHandle, event: ctypes.POINTER(xlclass.XLcanRxEvent)
 ) -> int:
-    event.tag = xldefine.XL_CANFD_RX_EventTags.XL_CAN_EV_TAG_RX_OK.value
+    event.tag = _XL_CAN_EV_TAG_RX_OK
     event.tagData.canRxOkMsg.canId = 0x123
     event.tagData.canRxOkMsg.dlc = 8
     event.tagData.canRxOkMsg.msgFlags = 0
     event.timeStamp = 0
     event.chanIndex = 0
-    for idx, value in enumerate([1, 2, 3, 4, 5, 6, 7, 8]):
-        event.tagData.canRxOkMsg.data[idx] = value
+    ctypes.memmove(event.tagData.canRxOkMsg.data, _RX_PAYLOAD, len(_RX_PAYLOAD))
     return 0
 
 
@@ -1276,7 +1190,7 @@ def xlReceive_chipstate(
     event_count_p: ctypes.POINTER(ctypes.c_uint),
     event: ctypes.POINTER(xlclass.XLevent),
 ) -> int:
-    event.tag = xldefine.XL_EventTags.XL_CHIP_STATE.value
+    event.tag = _XL_CHIP_STATE
     event.tagData.chipState.busStatus = 8
     event.tagData.chipState.rxErrorCounter = 0
     event.tagData.chipState.txErrorCounter = 0
@@ -1288,7 +1202,7 @@ def xlReceive_chipstate(
 def xlCanReceive_chipstate(
     port_handle: xlclass.XLportHandle, event: ctypes.POINTER(xlclass.XLcanRxEvent)
 ) -> int:
-    event.tag = xldefine.XL_CANFD_RX_EventTags.XL_CAN_EV_TAG_CHIP_STATE.value
+    event.tag = _XL_CAN_EV_TAG_CHIP_STATE
     event.tagData.canChipState.busStatus = 8
     event.tagData.canChipState.rxErrorCounter = 0
     event.tagData.canChipState.txErrorCounter = 0